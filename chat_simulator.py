@@ -2,15 +2,47 @@
 Chat simulator utilities for streaming LiteLLM responses as Job Events.
 """
 
+import atexit
+import contextvars
+import functools
+import importlib.util
 import json
 import os
+import queue
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass
 
 import httpx
 from ivcap_service import JobContext, getLogger
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up; fall back to stdlib json
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_proxy_url() -> str:
+    """Resolve the LiteLLM proxy base URL once per process."""
+    proxy = os.getenv("LITELLM_PROXY", "").strip(
+    ) or ChatSimulator.DEFAULT_LITELLM_PROXY
+    return proxy.rstrip("/")
+
+
+@functools.lru_cache(maxsize=1)
+def _chat_completions_url() -> str:
+    return f"{_resolve_proxy_url()}/v1/chat/completions"
+
 
 class ChatSimulationError(Exception):
     """Structured chat simulation error with stable code/message."""
@@ -21,6 +53,84 @@ class ChatSimulationError(Exception):
         super().__init__(f"{code}: {public_message}")
 
 
+class _TokenBatch:
+    """A queued ``chat:tokens:{n}`` write that can absorb later batches until taken."""
+
+    __slots__ = ("step_name", "text", "taken")
+
+    def __init__(self, step_name: str, text: str) -> None:
+        self.step_name = step_name
+        self.text = text
+        self.taken = False
+
+
+class _TokenWriter:
+    """
+    Writes one chat run's token batches from a background thread, in order.
+
+    Each run gets its own queue and writer thread, so a slow sidecar only
+    holds up the job it belongs to. The thread is started on the first batch,
+    inside a copy of the caller's context so token events stay in the
+    request's trace. While a batch is still waiting in the queue, later text
+    is appended to it, so a slow sidecar sees one larger event instead of a
+    backlog of small ones.
+    """
+
+    _STOP = object()
+
+    def __init__(self, report, logger) -> None:
+        self._report = report
+        self._logger = logger
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._merge_lock = threading.Lock()
+        self._pending: _TokenBatch | None = None
+        self._thread: threading.Thread | None = None
+
+    def merge(self, text: str, max_chars: int) -> bool:
+        """Append ``text`` to the queued batch if it has not been taken yet."""
+        with self._merge_lock:
+            pending = self._pending
+            if (
+                pending is not None
+                and not pending.taken
+                and len(pending.text) + len(text) <= max_chars
+            ):
+                pending.text += text
+                return True
+        return False
+
+    def put(self, step_name: str, text: str) -> None:
+        """Queue a new batch write."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=contextvars.copy_context().run, args=(self._run,),
+                name="chat-token-events", daemon=True)
+            self._thread.start()
+        self._pending = _TokenBatch(step_name, text)
+        self._queue.put(self._pending)
+
+    def close(self) -> None:
+        """Wait until every queued batch has been written."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            with self._merge_lock:
+                item.taken = True
+                text = item.text
+            try:
+                with self._report.step(item.step_name, message=text):
+                    pass  # start + finish emitted by context manager
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self._logger.warning("Background event write failed: %s", exc)
+
+
 @dataclass
 class ChatSimulationResult:
     """Result payload for a streamed chat run."""
@@ -39,18 +149,100 @@ class ChatSimulator:
     Streams an LLM response from LiteLLM and emits token/chunk events through JobContext.
     """
 
+    # -- Shared HTTP client -----------------------------------------------------
+    # One connection-pooled client per process so repeated chats reuse the
+    # TCP/TLS connection to the LiteLLM proxy instead of reconnecting each time.
+    _shared_client: httpx.Client | None = None
+    _shared_client_lock = threading.Lock()
+
+    @classmethod
+    def _get_shared_client(cls) -> httpx.Client:
+        """Return the process-wide pooled httpx client, creating it on first use."""
+        client = cls._shared_client
+        if client is not None:
+            return client
+        with cls._shared_client_lock:
+            if cls._shared_client is None:
+                cls._shared_client = httpx.Client(
+                    # HTTP/2 needs the optional ``h2`` package (httpx[http2]).
+                    http2=importlib.util.find_spec("h2") is not None,
+                    timeout=httpx.Timeout(
+                        connect=30.0, read=300.0, write=30.0, pool=30.0),
+                    limits=httpx.Limits(
+                        max_keepalive_connections=32, max_connections=64),
+                )
+                atexit.register(cls._shared_client.close)
+            return cls._shared_client
+
     def __init__(self, job_context: JobContext, logger=None):
         self.job_context = job_context
         self.logger = logger or getLogger("chat-simulator")
         self._event_count = 0
+        self._cached_bearer: str | None = None
+        self._cached_bearer_source: str | None = None
+        self._cached_headers: dict[str, str] = {}
+        # Per-run clock anchors for latency markers (reset by run_streaming_chat).
+        self._t0_ns = time.monotonic_ns()
+        self._wallclock_epoch_ms = time.time_ns() // 1_000_000
+        self.prewarm(self.logger)
+
+    # -- Connection pre-warming -------------------------------------------------
+    # The first chat in a process opens the connection to the LiteLLM proxy in
+    # the background while the request is being prepared, so DNS, TCP and TLS
+    # setup overlap with Python-side work instead of adding to TTFT.
+    PREWARM_WAIT_S = 0.1
+    _prewarm_started = False
+    _prewarm_done = threading.Event()
+
+    @classmethod
+    def prewarm(cls, logger=None) -> None:
+        """Start the one-off background connection to the proxy, if not yet started."""
+        with cls._shared_client_lock:
+            if cls._prewarm_started:
+                return
+            cls._prewarm_started = True
+        threading.Thread(
+            target=cls._prewarm,
+            args=(logger or getLogger("chat-simulator"),),
+            name="litellm-prewarm",
+            daemon=True,
+        ).start()
+
+    @classmethod
+    def _prewarm(cls, logger) -> None:
+        try:
+            # Any response (even 404/405) leaves a pooled keep-alive connection.
+            cls._get_shared_client().head(_resolve_proxy_url())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.debug("LiteLLM proxy pre-warm failed: %s", exc)
+        finally:
+            cls._prewarm_done.set()
 
     @staticmethod
     def _proxy_url() -> str:
-        proxy = os.getenv("LITELLM_PROXY", "").strip(
-        ) or ChatSimulator.DEFAULT_LITELLM_PROXY
-        return proxy.rstrip("/")
+        return _resolve_proxy_url()
+
+    _BASE_HEADERS = {"Content-Type": "application/json"}
 
     def _proxy_bearer_token(self) -> str:
+        # The token is stable for the lifetime of a job, so resolve it once and
+        # only re-resolve if the job authorization is swapped out underneath us.
+        job_auth = self.job_context.job_authorization
+        if self._cached_bearer is not None and self._cached_bearer_source is job_auth:
+            return self._cached_bearer
+        token = self._resolve_bearer_token(job_auth)
+        self._cached_bearer = token
+        self._cached_bearer_source = job_auth
+        self._cached_headers = {
+            **self._BASE_HEADERS, "Authorization": f"Bearer {token}"}
+        return token
+
+    def _request_headers(self) -> dict[str, str]:
+        """Headers for the LiteLLM request, built once per resolved token."""
+        self._proxy_bearer_token()
+        return self._cached_headers
+
+    def _resolve_bearer_token(self, job_authorization: str | None) -> str:
         # Prefer explicit env var for local runs.
         token = os.getenv("IVCAP_JWT", "").strip()
         if token:
@@ -59,7 +251,7 @@ class ChatSimulator:
             return token
 
         # Fall back to runtime-provided job authorization on deployed runs.
-        job_auth = (self.job_context.job_authorization or "").strip()
+        job_auth = (job_authorization or "").strip()
         if job_auth:
             self.logger.info(
                 "Using LiteLLM auth token source: JobContext.job_authorization")
@@ -76,15 +268,37 @@ class ChatSimulator:
             "Set IVCAP_JWT (local) or ensure job authorization is available (deployed)."
         )
 
+    @staticmethod
+    def _iter_sse_data(response: httpx.Response):
+        """
+        Yield the payload of each SSE ``data:`` line as bytes.
+
+        Frames are split on raw bytes so blank separators, comments and
+        keep-alives are skipped without being decoded to ``str``.
+        """
+        buf = bytearray()
+        for chunk in response.iter_bytes():
+            buf += chunk
+            start = 0
+            while True:
+                end = buf.find(b"\n", start)
+                if end < 0:
+                    break
+                if buf.startswith(b"data:", start, end):
+                    yield bytes(buf[start + 5:end]).strip()
+                start = end + 1
+            del buf[:start]
+        if buf.startswith(b"data:"):
+            yield bytes(buf[5:]).strip()
+
     @staticmethod
     def _extract_delta_content(payload: dict) -> str:
-        choices = payload.get("choices")
-        if not isinstance(choices, list) or not choices:
+        # Fast path: the overwhelmingly common shape is a plain string delta.
+        try:
+            content = payload["choices"][0]["delta"]["content"]
+        except (KeyError, IndexError, TypeError):
             return ""
-
-        delta = choices[0].get("delta", {})
-        content = delta.get("content")
-        if isinstance(content, str):
+        if type(content) is str:
             return content
 
         # Some providers may send structured segments; keep text fragments.
@@ -120,22 +334,43 @@ class ChatSimulator:
     FIRST_BATCH_FLUSH_MAX_TOKENS = 3    # first batch: flush when 3 chunks accumulated
     BATCH_FLUSH_INTERVAL_S = 0.3         # normal batches: flush at most every 300 ms
     BATCH_FLUSH_MAX_TOKENS = 20          # normal batches: or when 20 chunks accumulated
+    BATCH_FLUSH_MAX_CHARS = 16 * 1024    # any batch: flush once 16 KiB of text is buffered
+    MAX_RESPONSE_CHARS = 10 * 1024 * 1024  # abort responses larger than 10 MiB of text
     LATENCY_META_PREFIX = "__latency_meta__:"
 
-    def _emit_latency_marker(self, step_name: str, label: str, **kwargs) -> None:
-        """Emit a lightweight latency marker event with JSON metadata."""
+    def _emit_latency_marker(self, step_name: str, label: str, **kwargs) -> int:
+        """
+        Emit a lightweight latency marker event with JSON metadata.
+
+        Returns the number of events emitted so callers can keep a local count.
+        """
         if not self.job_context.report:
-            return
-        payload = {
-            "label": label,
-            "server_emit_ts_ms": int(time.time() * 1000),
-            **kwargs,
-        }
-        with self.job_context.report.step(
-            step_name,
-            message=f"{self.LATENCY_META_PREFIX}{json.dumps(payload, separators=(',', ':'))}",
-        ):
-            self._event_count += 2
+            return 0
+        # Offsets come from the monotonic clock so markers within a job are
+        # immune to wall-clock adjustments; the client still receives an epoch
+        # timestamp anchored on the single wall-clock read taken at job start.
+        offset_ms = (time.monotonic_ns() - self._t0_ns) // 1_000_000
+        prefix = self._latency_marker_prefix(label, tuple(kwargs.items()))
+        message = (
+            f'{prefix}"offset_ms":{offset_ms},'
+            f'"server_emit_ts_ms":{self._wallclock_epoch_ms + offset_ms}}}'
+        )
+        with self.job_context.report.step(step_name, message=message):
+            pass
+        return 2
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def _latency_marker_prefix(cls, label: str, static_fields: tuple) -> str:
+        """
+        JSON-encode the static part of a latency marker once.
+
+        Returns the marker prefix plus an open JSON object holding ``label``
+        and any static fields, ready for the per-emit timestamps to be appended.
+        """
+        body = json.dumps({"label": label, **dict(static_fields)},
+                          separators=(",", ":"))
+        return f"{cls.LATENCY_META_PREFIX}{body[:-1]},"
 
     def run_streaming_chat(
         self,
@@ -144,66 +379,58 @@ class ChatSimulator:
         temperature: float | None = None,
         max_tokens: int | None = None,
     ) -> ChatSimulationResult:
-        start = time.time()
-        self._event_count = 0
+        self._t0_ns = time.monotonic_ns()
+        self._wallclock_epoch_ms = time.time_ns() // 1_000_000
+        # Events are counted in a local and written back once on completion.
+        ec = 0
         chunks_emitted = 0
         approx_tokens_emitted = 0
-        response_chunks: list[str] = []
+        # Joined text of each flushed batch; the full response is assembled
+        # from these at the end rather than keeping a second per-token list.
+        full_text_parts: list[str] = []
 
         # -- Batch state -------------------------------------------------------
         batch_buffer: list[str] = []
+        batch_chars = 0
+        response_chars = 0
         batch_num = 0
         last_flush = time.monotonic()
         first_batch_marker_emitted = False
         first_upstream_delta_emitted = False
 
-        # Background thread for non-blocking event writes.  A single worker
-        # preserves event ordering while letting the LLM stream loop continue
-        # without waiting for the sidecar HTTP round-trip.
-        executor = ThreadPoolExecutor(
-            max_workers=1, thread_name_prefix="event-flush")
-        pending_futures: list[Future] = []
+        # Token batches are written by this run's background writer so the
+        # LLM stream loop never waits on the sidecar HTTP round-trip.
+        token_writer = _TokenWriter(self.job_context.report, self.logger)
 
         def flush_batch() -> None:
             """Submit a background Job Event write for all buffered token text."""
-            nonlocal batch_num, last_flush, first_batch_marker_emitted
+            nonlocal ec, batch_num, batch_chars, last_flush
+            nonlocal first_batch_marker_emitted
             if not batch_buffer:
                 return
             if not first_batch_marker_emitted:
                 first_batch_marker_emitted = True
-                self._emit_latency_marker(
+                ec += self._emit_latency_marker(
                     "chat:latency:first-batch",
                     "First token batch emitted to Job Events",
                     batch_num=1,
                 )
-            batch_num += 1
             text = "".join(batch_buffer)
+            full_text_parts.append(text)
             batch_buffer.clear()
+            batch_chars = 0
             last_flush = time.monotonic()
-            step_name = f"chat:tokens:{batch_num}"
-
-            def _emit() -> None:
-                with self.job_context.report.step(step_name, message=text):
-                    pass  # start + finish emitted by context manager
 
-            pending_futures.append(executor.submit(_emit))
-            self._event_count += 2  # start + finish
-
-        def drain_pending() -> None:
-            """Wait for all background event writes to complete."""
-            for fut in pending_futures:
-                try:
-                    fut.result(timeout=30)
-                except Exception as exc:
-                    self.logger.warning(
-                        "Background event write failed: %s", exc)
-            pending_futures.clear()
+            # Coalesce into the previous batch if the writer has not picked
+            # it up yet; otherwise queue a new chat:tokens:{n} event.
+            if token_writer.merge(text, self.BATCH_FLUSH_MAX_CHARS):
+                return
+            batch_num += 1
+            token_writer.put(f"chat:tokens:{batch_num}", text)
+            ec += 2  # start + finish
 
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self._proxy_bearer_token()}",
-            }
+            headers = self._request_headers()
 
             payload: dict = {
                 "model": model,
@@ -215,10 +442,10 @@ class ChatSimulator:
             if max_tokens is not None:
                 payload["max_tokens"] = max_tokens
 
-            endpoint = f"{self._proxy_url()}/v1/chat/completions"
+            endpoint = _chat_completions_url()
             self.logger.info(
                 "Submitting streaming chat request to %s", endpoint)
-            self._emit_latency_marker(
+            ec += self._emit_latency_marker(
                 "chat:latency:request-dispatch",
                 "Outbound request dispatched to LiteLLM proxy",
             )
@@ -226,114 +453,124 @@ class ChatSimulator:
             with self.job_context.report.step(
                 "chat:request", message=f"Submitting chat request to model '{model}'"
             ) as request_step:
-                self._event_count += 1
-
-                with httpx.Client(timeout=httpx.Timeout(connect=30.0, read=300.0, write=30.0, pool=30.0)) as client:
-                    with client.stream("POST", endpoint, headers=headers, json=payload) as response:
-                        if response.is_error:
-                            # Capture upstream LiteLLM body + call id to make 4xx/5xx debugging actionable.
-                            error_body = ""
-                            try:
-                                error_body = response.read().decode("utf-8", errors="replace")
-                            except Exception:
-                                error_body = "<unavailable>"
-                            error_body = (error_body or "").strip()
-                            if len(error_body) > 1000:
-                                error_body = error_body[:1000] + \
-                                    "...<truncated>"
-                            call_id = (response.headers.get(
-                                "x-litellm-call-id") or "").strip()
-                            call_id_msg = f", call_id={call_id}" if call_id else ""
-                            raise ChatSimulationError(
-                                "CHAT_LITELLM_HTTP_ERROR",
-                                f"LiteLLM proxy request failed ({response.status_code}{call_id_msg}): "
-                                f"{error_body or '<empty body>'}",
-                            )
-
-                        request_step.finished(
-                            "Chat request accepted by LiteLLM proxy")
-                        self._event_count += 1
-                        self._emit_latency_marker(
-                            "chat:latency:upstream-accepted",
-                            "LiteLLM proxy accepted upstream request",
+                ec += 1
+
+                # Give an in-flight pre-warm a brief chance to finish so the
+                # request reuses its connection, without blocking on it.
+                self._prewarm_done.wait(timeout=self.PREWARM_WAIT_S)
+                client = self._get_shared_client()
+                with client.stream("POST", endpoint, headers=headers, content=_json_dumps_bytes(payload)) as response:
+                    if response.is_error:
+                        # Capture upstream LiteLLM body + call id to make 4xx/5xx debugging actionable.
+                        error_body = ""
+                        try:
+                            error_body = response.read().decode("utf-8", errors="replace")
+                        except Exception:
+                            error_body = "<unavailable>"
+                        error_body = (error_body or "").strip()
+                        if len(error_body) > 1000:
+                            error_body = error_body[:1000] + \
+                                "...<truncated>"
+                        call_id = (response.headers.get(
+                            "x-litellm-call-id") or "").strip()
+                        call_id_msg = f", call_id={call_id}" if call_id else ""
+                        raise ChatSimulationError(
+                            "CHAT_LITELLM_HTTP_ERROR",
+                            f"LiteLLM proxy request failed ({response.status_code}{call_id_msg}): "
+                            f"{error_body or '<empty body>'}",
                         )
 
-                        with self.job_context.report.step(
-                            "chat:response", message="Streaming model response"
-                        ) as response_step:
-                            self._event_count += 1
-
-                            for raw_line in response.iter_lines():
-                                if not raw_line:
-                                    continue
-                                line = raw_line.strip()
-                                if not line.startswith("data:"):
-                                    continue
-
-                                data = line[len("data:"):].strip()
-                                if data == "[DONE]":
-                                    break
-
-                                try:
-                                    parsed = json.loads(data)
-                                except json.JSONDecodeError:
-                                    self.logger.warning(
-                                        "Skipping non-JSON stream chunk: %s", data[:120])
-                                    continue
-
-                                delta = self._extract_delta_content(parsed)
-                                if not delta:
-                                    continue
-
-                                if not first_upstream_delta_emitted:
-                                    first_upstream_delta_emitted = True
-                                    self._emit_latency_marker(
-                                        "chat:latency:first-upstream-delta",
-                                        "First upstream delta received from model stream",
-                                    )
-
-                                chunks_emitted += 1
-                                approx_tokens_emitted += max(1,
-                                                             len(delta.split()))
-                                response_chunks.append(delta)
-
-                                # Buffer the token and flush when thresholds are met
-                                batch_buffer.append(delta)
-                                if not first_batch_marker_emitted:
-                                    flush_max_tokens = self.FIRST_BATCH_FLUSH_MAX_TOKENS
-                                    flush_interval_s = self.FIRST_BATCH_FLUSH_INTERVAL_S
-                                else:
-                                    flush_max_tokens = self.BATCH_FLUSH_MAX_TOKENS
-                                    flush_interval_s = self.BATCH_FLUSH_INTERVAL_S
-
-                                if (
-                                    len(batch_buffer) >= flush_max_tokens
-                                    or time.monotonic() - last_flush >= flush_interval_s
-                                ):
-                                    flush_batch()
-
-                            # Flush any remaining buffered tokens
-                            flush_batch()
-
-                            # Wait for all background event writes before
-                            # closing the response step.
-                            drain_pending()
-
-                            response_step.finished(
-                                f"Completed streaming {chunks_emitted} chunks")
-                            self._event_count += 1
+                    request_step.finished(
+                        "Chat request accepted by LiteLLM proxy")
+                    ec += 1
+                    ec += self._emit_latency_marker(
+                        "chat:latency:upstream-accepted",
+                        "LiteLLM proxy accepted upstream request",
+                    )
+
+                    with self.job_context.report.step(
+                        "chat:response", message="Streaming model response"
+                    ) as response_step:
+                        ec += 1
+
+                        for data in self._iter_sse_data(response):
+                            if data == b"[DONE]":
+                                break
+                            # Role-only, finish_reason and tool-call frames carry
+                            # no text; skip them before paying for a JSON parse.
+                            if b'"content"' not in data:
+                                continue
+
+                            try:
+                                parsed = _json_loads(data)
+                            except json.JSONDecodeError:
+                                self.logger.warning(
+                                    "Skipping non-JSON stream chunk: %s",
+                                    data[:120].decode("utf-8", errors="replace"))
+                                continue
+
+                            delta = self._extract_delta_content(parsed)
+                            if not delta:
+                                continue
+
+                            if not first_upstream_delta_emitted:
+                                first_upstream_delta_emitted = True
+                                ec += self._emit_latency_marker(
+                                    "chat:latency:first-upstream-delta",
+                                    "First upstream delta received from model stream",
+                                )
+
+                            chunks_emitted += 1
+                            approx_tokens_emitted += max(1,
+                                                         len(delta.split()))
+
+                            response_chars += len(delta)
+                            if response_chars > self.MAX_RESPONSE_CHARS:
+                                raise ChatSimulationError(
+                                    "CHAT_RESPONSE_TOO_LARGE",
+                                    f"Model response exceeded {self.MAX_RESPONSE_CHARS} characters",
+                                )
+
+                            # Buffer the token and flush when thresholds are met
+                            batch_buffer.append(delta)
+                            batch_chars += len(delta)
+                            if first_batch_marker_emitted:
+                                flush_max_tokens = self.BATCH_FLUSH_MAX_TOKENS
+                                flush_interval_s = self.BATCH_FLUSH_INTERVAL_S
+                            else:
+                                flush_max_tokens = self.FIRST_BATCH_FLUSH_MAX_TOKENS
+                                flush_interval_s = self.FIRST_BATCH_FLUSH_INTERVAL_S
+
+                            if (
+                                len(batch_buffer) >= flush_max_tokens
+                                or batch_chars >= self.BATCH_FLUSH_MAX_CHARS
+                                or time.monotonic() - last_flush >= flush_interval_s
+                            ):
+                                flush_batch()
+
+                        # Flush any remaining buffered tokens
+                        flush_batch()
+
+                        # Wait for all background event writes before
+                        # closing the response step.
+                        token_writer.close()
+
+                        response_step.finished(
+                            f"Completed streaming {chunks_emitted} chunks")
+                        ec += 1
 
             with self.job_context.report.step("chat:complete", message="Chat response finalized"):
-                self._event_count += 2
+                ec += 2
 
-            response_text = "".join(response_chunks).strip()
-            elapsed = time.time() - start
+            response_text = "".join(full_text_parts).strip()
+            self._event_count = ec
+            elapsed = (time.monotonic_ns() - self._t0_ns) / 1e9
             return ChatSimulationResult(
                 model=model,
                 response_text=response_text,
                 chunks_emitted=chunks_emitted,
                 approx_tokens_emitted=approx_tokens_emitted,
-                total_events=self._event_count,
+                total_events=ec,
                 elapsed_seconds=elapsed,
             )
         except ChatSimulationError as e:
@@ -352,4 +589,5 @@ class ChatSimulator:
             self._emit_error_event(str(wrapped))
             raise wrapped from e
         finally:
-            executor.shutdown(wait=False)
+            # Stop this run's writer on every path (a no-op once drained).
+            token_writer.close()
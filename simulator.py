@@ -5,13 +5,18 @@ Loads preset workflow definitions and executes them, emitting IVCAP events
 with randomized timing to simulate multi-agent workflows.
 """
 
-import json
+import contextvars
+import logging
+import os
+import queue
 import random
+import threading
 import time
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Callable, NamedTuple, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from ivcap_service import JobContext, getLogger
 
 
@@ -49,6 +54,87 @@ class WorkflowPreset(BaseModel):
     phases: list[PhaseConfig] = Field(
         description="Ordered list of workflow phases")
 
+    # Step ids, messages and delay bounds derived from this preset; built on
+    # first run.
+    _compiled: Optional["_CompiledPreset"] = PrivateAttr(default=None)
+
+
+@dataclass
+class _CompiledAgent:
+    """Pre-built step ids and messages for one agent."""
+    step_id: str
+    start_message: str
+    finish_message: str
+    delay_range_ms: list[int]
+    tasks: list[tuple[str, str]]  # (step_id, message) per task
+
+
+@dataclass
+class _CompiledPhase:
+    """Pre-built step ids and messages for one phase and its agents."""
+    step_id: str
+    start_message: str
+    finish_message: str
+    delay_range_ms: list[int]
+    agents: list[_CompiledAgent]
+
+
+@dataclass
+class _CompiledPreset:
+    """
+    A preset flattened for execution.
+
+    ``delay_min_ms``/``delay_max_ms`` hold the bounds of every delay a run
+    draws, in the order the schedule consumes them: phase start, each task,
+    agent finish, phase finish.
+    """
+    phases: list[_CompiledPhase]
+    delay_min_ms: list[int]
+    delay_max_ms: list[int]
+
+
+def _compile_preset(preset: WorkflowPreset) -> _CompiledPreset:
+    """Build (once per preset) every step id and message a run will emit."""
+    if preset._compiled is None:
+        phases = []
+        bounds: list[list[int]] = []
+        for phase in preset.phases:
+            agents = []
+            bounds.append(phase.delay_range_ms)
+            for agent in phase.agents:
+                agent_step_id = f"agent:{phase.id}:{agent.id}"
+                bounds.extend([agent.delay_range_ms] * (len(agent.tasks) + 1))
+                agents.append(_CompiledAgent(
+                    step_id=agent_step_id,
+                    start_message=f"{agent.name} started",
+                    finish_message=f"{agent.name} completed",
+                    delay_range_ms=agent.delay_range_ms,
+                    tasks=[(f"{agent_step_id}:task-{i+1}", task)
+                           for i, task in enumerate(agent.tasks)],
+                ))
+            bounds.append(phase.delay_range_ms)
+            phases.append(_CompiledPhase(
+                step_id=f"phase:{phase.id}",
+                start_message=f"{phase.name} started",
+                finish_message=f"{phase.name} completed",
+                delay_range_ms=phase.delay_range_ms,
+                agents=agents,
+            ))
+        preset._compiled = _CompiledPreset(
+            phases=phases,
+            delay_min_ms=[lo for lo, _ in bounds],
+            delay_max_ms=[hi for _, hi in bounds],
+        )
+    return preset._compiled
+
+
+class _ScheduledEvent(NamedTuple):
+    """A workflow event placed on the precomputed simulation timeline."""
+    at_s: float
+    kind: str  # "start", "finish" or "instant"
+    step_id: str
+    message: str
+
 
 @dataclass
 class SimulationResult:
@@ -60,6 +146,102 @@ class SimulationResult:
     elapsed_seconds: float
 
 
+class _EventBatcher:
+    """
+    Writes workflow step events to the job reporter from a background thread.
+
+    The simulation thread only enqueues ``start``/``finish``/``instant``
+    operations; a single consumer drains whatever has accumulated and writes it
+    in FIFO order, so event ordering is preserved while the simulated timeline
+    never waits on a sidecar round-trip. Leaving the context manager flushes
+    everything queued, closing any still-open steps with the exception (if any)
+    that ended the run.
+    """
+
+    _STOP = object()
+
+    def __init__(self, report, logger):
+        self._step = report.step
+        self._logger = logger
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._open: dict[str, tuple] = {}
+        self._writers = self._make_writers()
+        # Write from a copy of the caller's context so events (and the tracing
+        # spans report.step() opens) stay attached to the request's trace.
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(self._run,),
+            name="workflow-events", daemon=True)
+
+    def __enter__(self) -> "_EventBatcher":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._queue.put((self._STOP, exc_type, exc, tb))
+        self._thread.join()
+
+    def started(self, step_id: str, message: str) -> None:
+        self._queue.put(("start", step_id, message))
+
+    def finished(self, step_id: str, message: str) -> None:
+        self._queue.put(("finish", step_id, message))
+
+    def instant(self, step_id: str, message: str) -> None:
+        self._queue.put(("instant", step_id, message))
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already queued so a burst of events is
+            # written back-to-back without re-entering the blocking get().
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            writers = self._writers
+            for op in batch:
+                if op[0] is self._STOP:
+                    self._close_open_steps(*op[1:])
+                    return
+                kind, step_id, message = op
+                try:
+                    writers[kind](step_id, message)
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    self._logger.warning(
+                        "Workflow event write failed: %s", exc)
+
+    def _make_writers(self) -> dict[str, Callable[[str, str], None]]:
+        # Bind each operation to the reporter's ``step`` context manager once;
+        # started steps keep their open context until the matching finish.
+        step_cm = self._step
+        open_steps = self._open
+
+        def instant(step_id: str, message: str) -> None:
+            with step_cm(step_id, message=message):
+                pass  # start + finish emitted by context manager
+
+        def start(step_id: str, message: str) -> None:
+            ctx = step_cm(step_id, message=message)
+            open_steps[step_id] = (ctx, ctx.__enter__())
+
+        def finish(step_id: str, message: str) -> None:
+            ctx, step = open_steps.pop(step_id)
+            step.finished(message)
+            ctx.__exit__(None, None, None)
+
+        return {"start": start, "finish": finish, "instant": instant}
+
+    def _close_open_steps(self, exc_type, exc, tb) -> None:
+        for step_id in reversed(list(self._open)):
+            ctx, _ = self._open.pop(step_id)
+            try:
+                ctx.__exit__(exc_type, exc, tb)
+            except Exception as write_exc:  # pylint: disable=broad-exception-caught
+                self._logger.warning(
+                    "Workflow event write failed: %s", write_exc)
+
+
 class WorkflowSimulator:
     """
     Executes workflow simulations based on preset definitions,
@@ -67,22 +249,34 @@ class WorkflowSimulator:
     """
 
     MAX_TIMER_SECONDS = 600
+    MIN_TICK_INTERVAL_SECONDS = 0.01
     PRESETS_DIR = Path(__file__).parent / "presets"
 
+    # Parsed presets keyed by path, invalidated when the file's mtime changes,
+    # plus the preset listing keyed by the directory's mtime.
+    _preset_cache: dict[Path, tuple[int, WorkflowPreset]] = {}
+    _preset_list_cache: tuple[int, list[str]] | None = None
+    _preset_cache_lock = threading.Lock()
+
     def __init__(
         self,
         job_context: JobContext,
         logger=None,
+        seed: Optional[int] = None,
     ):
         """
         Initialize the simulator.
 
         Args:
             job_context: IVCAP JobContext for emitting events
+            seed: Seed for the delay generator, for reproducible timings.
         """
         self.job_context = job_context
         self._event_count = 0
         self._agents_executed = 0
+        self._events: _EventBatcher | None = None
+        self._rng = random.Random(seed)
+        self._log_steps = False
         self.logger = logger or getLogger("simulator")
 
     def load_preset(self, preset_name: str) -> WorkflowPreset:
@@ -101,68 +295,105 @@ class WorkflowSimulator:
         """
         preset_path = self.PRESETS_DIR / f"{preset_name}.json"
 
-        if not preset_path.exists():
-            available = [p.stem for p in self.PRESETS_DIR.glob("*.json")]
+        try:
+            mtime_ns = preset_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            available = self.list_presets()
             raise FileNotFoundError(
                 f"Preset '{preset_name}' not found. Available presets: {available}"
-            )
+            ) from None
 
-        with open(preset_path) as f:
-            data = json.load(f)
+        with self._preset_cache_lock:
+            cached = self._preset_cache.get(preset_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
 
-        return WorkflowPreset(**data)
+        # Parse and validate in a single pydantic-core pass.
+        preset = WorkflowPreset.model_validate_json(preset_path.read_bytes())
+        with self._preset_cache_lock:
+            self._preset_cache[preset_path] = (mtime_ns, preset)
+        return preset
 
     def list_presets(self) -> list[str]:
         """Return list of available preset names."""
-        if not self.PRESETS_DIR.exists():
+        try:
+            mtime_ns = self.PRESETS_DIR.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        cached = WorkflowSimulator._preset_list_cache
+        if cached is not None and cached[0] == mtime_ns:
+            return list(cached[1])
+
+        try:
+            with os.scandir(self.PRESETS_DIR) as entries:
+                names = [
+                    entry.name[:-5] for entry in entries
+                    if entry.name.endswith(".json") and entry.is_file()
+                ]
+        except OSError:
             return []
-        return [p.stem for p in self.PRESETS_DIR.glob("*.json")]
-
-    def _random_delay(self, delay_range_ms: list[int]) -> None:
-        """Sleep for a random duration within the given range."""
-        min_ms, max_ms = delay_range_ms
-        delay_ms = random.randint(min_ms, max_ms)
-        time.sleep(delay_ms / 1000.0)
-
-    def _execute_agent(self, phase_id: str, agent: AgentConfig) -> None:
-        """Execute a single agent's tasks within a phase."""
-        agent_step_id = f"agent:{phase_id}:{agent.id}"
-
-        self.logger.info("Starting agent %s: %s", agent_step_id, agent.name)
-        with self.job_context.report.step(agent_step_id, message=f"{agent.name} started") as agent_step:
-            self._event_count += 1
-
-            # Execute each task
-            for i, task in enumerate(agent.tasks):
-                self._random_delay(agent.delay_range_ms)
-                status_step_id = f"{agent_step_id}:task-{i+1}"
-                self.logger.info("Task %s: %s", status_step_id, task)
-                with self.job_context.report.step(status_step_id, message=task):
-                    self._event_count += 2  # start + finish
-
-            # Agent completed
-            self._random_delay(agent.delay_range_ms)
-            agent_step.finished(f"{agent.name} completed")
-            self._event_count += 1
-        self._agents_executed += 1
-
-    def _execute_phase(self, phase: PhaseConfig) -> None:
-        """Execute a single workflow phase and all its agents."""
-        phase_step_id = f"phase:{phase.id}"
-
-        self.logger.info("Starting phase %s: %s", phase_step_id, phase.name)
-        with self.job_context.report.step(phase_step_id, message=f"{phase.name} started") as phase_step:
-            self._event_count += 1
-            self._random_delay(phase.delay_range_ms)
-
-            # Execute all agents in the phase
+        with self._preset_cache_lock:
+            WorkflowSimulator._preset_list_cache = (mtime_ns, names)
+        return list(names)
+
+    def _draw_delays_s(self, compiled: _CompiledPreset) -> list[float]:
+        """Draw every delay (in seconds) for one run of a compiled preset."""
+        lows, highs = compiled.delay_min_ms, compiled.delay_max_ms
+        rand = self._rng.random
+        # Equivalent to randint(lo, hi) without the _randbelow overhead.
+        return [(lo + int(rand() * (hi - lo + 1))) / 1000.0
+                for lo, hi in zip(lows, highs)]
+
+    def _build_schedule(self, preset: WorkflowPreset) -> list[_ScheduledEvent]:
+        """
+        Lay out every phase/agent/task event of the preset on an absolute
+        timeline (seconds from workflow start) with freshly drawn delays.
+        """
+        compiled = _compile_preset(preset)
+        delays = iter(self._draw_delays_s(compiled))
+        schedule: list[_ScheduledEvent] = []
+        append = schedule.append
+        at_s = 0.0
+
+        for phase in compiled.phases:
+            append(_ScheduledEvent(
+                at_s, "start", phase.step_id, phase.start_message))
+            at_s += next(delays)
+
             for agent in phase.agents:
-                self._execute_agent(phase.id, agent)
+                append(_ScheduledEvent(
+                    at_s, "start", agent.step_id, agent.start_message))
 
-            # Phase completed
-            self._random_delay(phase.delay_range_ms)
-            phase_step.finished(f"{phase.name} completed")
-            self._event_count += 1
+                for task_step_id, task in agent.tasks:
+                    at_s += next(delays)
+                    append(_ScheduledEvent(
+                        at_s, "instant", task_step_id, task))
+
+                at_s += next(delays)
+                append(_ScheduledEvent(
+                    at_s, "finish", agent.step_id, agent.finish_message))
+
+            at_s += next(delays)
+            append(_ScheduledEvent(
+                at_s, "finish", phase.step_id, phase.finish_message))
+
+        return schedule
+
+    def _emit_scheduled(self, event: _ScheduledEvent) -> None:
+        """
+        Emit one scheduled phase/agent/task event. Events are counted by the
+        caller: one per start/finish, two per instant step.
+        """
+        if self._log_steps:
+            self.logger.debug("Step %s %s: %s", event.kind,
+                              event.step_id, event.message)
+        if event.kind == "instant":
+            self._events.instant(event.step_id, event.message)
+        elif event.kind == "start":
+            self._events.started(event.step_id, event.message)
+        else:
+            self._events.finished(event.step_id, event.message)
 
     def run(self, preset_name: str) -> SimulationResult:
         """
@@ -180,21 +411,40 @@ class WorkflowSimulator:
 
         # Load and validate preset
         preset = self.load_preset(preset_name)
+        schedule = self._build_schedule(preset)
 
         # Run entire workflow inside a top-level step
         workflow_step_id = f"workflow:{preset.name}"
         self.logger.info("Starting workflow: %s", preset.description)
-        with self.job_context.report.step(workflow_step_id, message=f"Starting workflow: {preset.description}") as workflow_step:
-            self._event_count += 1
-
-            # Execute all phases in order
-            for phase in preset.phases:
-                self._execute_phase(phase)
-
-            # Emit workflow completion
-            elapsed = time.time() - start_time
-            workflow_step.finished(f"Workflow completed in {elapsed:.1f}s")
-            self._event_count += 1
+        # Per-event logging is debug-only; check the level once per run.
+        self._log_steps = self.logger.isEnabledFor(logging.DEBUG)
+        try:
+            with _EventBatcher(self.job_context.report, self.logger) as events:
+                self._events = events
+                events.started(workflow_step_id,
+                               f"Starting workflow: {preset.description}")
+                self._event_count += 1
+
+                # Sleep to each event's absolute deadline so per-event
+                # overhead never accumulates into timing drift.
+                origin = time.monotonic()
+                for event in schedule:
+                    wait_s = origin + event.at_s - time.monotonic()
+                    if wait_s > 0:
+                        time.sleep(wait_s)
+                    self._emit_scheduled(event)
+                self._event_count += len(schedule) + sum(
+                    event.kind == "instant" for event in schedule)
+                self._agents_executed = sum(
+                    len(phase.agents) for phase in preset.phases)
+
+                # Emit workflow completion
+                elapsed = time.time() - start_time
+                events.finished(workflow_step_id,
+                                f"Workflow completed in {elapsed:.1f}s")
+                self._event_count += 1
+        finally:
+            self._events = None
 
         return SimulationResult(
             preset_name=preset.name,
@@ -213,31 +463,40 @@ class WorkflowSimulator:
         Run a simple timer/tick simulation for a fixed duration.
 
         Emits one event per tick interval using the step context manager.
+        Intervals below ``MIN_TICK_INTERVAL_SECONDS`` are raised to it.
         """
-        start_time = time.time()
         self._event_count = 0
         self._agents_executed = 0
 
-        end_time = start_time + total_run_time_seconds
+        # Ticks are written synchronously and only while the run window is
+        # open, so a slow reporter delays ticks rather than extending the run.
+        # Each tick is due at an absolute deadline (integer monotonic ns) so
+        # the cadence does not drift with per-tick overhead.
+        report = self.job_context.report
+        log_ticks = self.logger.isEnabledFor(logging.DEBUG)
+        tick_ns = round(
+            max(tick_interval_seconds, self.MIN_TICK_INTERVAL_SECONDS) * 1e9)
+        start_ns = time.monotonic_ns()
+        end_ns = start_ns + round(total_run_time_seconds * 1e9)
         tick_index = 0
 
-        while time.time() < end_time:
+        while time.monotonic_ns() < end_ns:
             tick_index += 1
-            step_id = f"timer:tick:{tick_index}"
-            self.logger.info("Tick %d", tick_index)
-            with self.job_context.report.step(step_id, message=f"Tick {tick_index}"):
-                self._event_count += 2  # start + finish
+            if log_ticks:
+                self.logger.debug("Tick %d", tick_index)
+            with report.step(f"timer:tick:{tick_index}", message=f"Tick {tick_index}"):
+                pass  # start + finish emitted by context manager
 
-            remaining = end_time - time.time()
-            if remaining <= 0:
-                break
-            time.sleep(min(tick_interval_seconds, remaining))
+            deadline_ns = min(start_ns + tick_index * tick_ns, end_ns)
+            wait_ns = deadline_ns - time.monotonic_ns()
+            if wait_ns > 0:
+                time.sleep(wait_ns / 1e9)
+        self._event_count = 2 * tick_index  # start + finish per tick
 
-        elapsed = time.time() - start_time
         return SimulationResult(
             preset_name="timer_tick",
             phases_completed=0,
             agents_executed=0,
             total_events=self._event_count,
-            elapsed_seconds=elapsed,
+            elapsed_seconds=(time.monotonic_ns() - start_ns) / 1e9,
         )
@@ -1,4 +1,6 @@
+import copy
 import time
+from functools import cached_property
 
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Literal
@@ -27,11 +29,97 @@ service = Service(
 )
 
 
+# Schema identifiers for the request and result formats.
+REQUEST_SCHEMA = "urn:sd:schema.workflow-simulator.request.1"
+RESULT_SCHEMA = "urn:sd:schema.workflow-simulator.1"
+CHAT_REQUEST_SCHEMA = "urn:sd:schema.workflow-simulator.chat.request.1"
+CHAT_RESULT_SCHEMA = "urn:sd:schema.workflow-simulator.chat.result.1"
+
+# JSON schema examples, built once and shared by the models below.
+_REQUEST_SCHEMA_EXTRA = {
+    "examples": [
+        {
+            "$schema": REQUEST_SCHEMA,
+            "preset_name": "deep_research"
+        },
+        {
+            "$schema": REQUEST_SCHEMA,
+            "mode": "warm"
+        },
+    ]
+}
+
+_RESULT_SCHEMA_EXTRA = {
+    "example": {
+        "$schema": RESULT_SCHEMA,
+        "message": "Workflow completed successfully",
+        "preset_name": "deep_research",
+        "phases_completed": 5,
+        "agents_executed": 12,
+        "total_events": 48,
+        "elapsed_seconds": 45.2
+    }
+}
+
+_CHAT_REQUEST_SCHEMA_EXTRA = {
+    "example": {
+        "$schema": CHAT_REQUEST_SCHEMA,
+        "model": "gpt-5-mini",
+        "messages": [
+            {"role": "system", "content": "You are concise and helpful."},
+            {"role": "user", "content": "Summarize the benefits of event streaming in one sentence."}
+        ]
+    }
+}
+
+_CHAT_RESULT_SCHEMA_EXTRA = {
+    "example": {
+        "$schema": CHAT_RESULT_SCHEMA,
+        "message": "Chat completed successfully",
+        "model": "gpt-5-mini",
+        "response_text": "Event streaming improves responsiveness by delivering partial output immediately.",
+        "chunks_emitted": 12,
+        "approx_tokens_emitted": 24,
+        "total_events": 31,
+        "elapsed_seconds": 2.41
+    }
+}
+
+
+class _SchemaCachedModel(BaseModel):
+    """
+    Base model whose default JSON schema is generated once per class.
+
+    The tool framework asks for ``model_json_schema()`` whenever it builds
+    tool and service definitions; callers that pass options still get a
+    freshly generated schema.
+    """
+
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs):
+        if args or kwargs:
+            return super().model_json_schema(*args, **kwargs)
+        schema = cls.__dict__.get("_default_json_schema")
+        if schema is None:
+            schema = super().model_json_schema()
+            type.__setattr__(cls, "_default_json_schema", schema)
+        # Hand out a copy so callers cannot mutate the cached schema.
+        return copy.deepcopy(schema)
+
+
+class ChatMessage(BaseModel):
+    role: Literal["system", "user", "assistant"] = Field(
+        description="Role of this chat message"
+    )
+    content: str = Field(description="Text content of the message")
+
+    model_config = ConfigDict(frozen=True)
+
+
 # Specify input value(s).
-class Request(BaseModel):
+class Request(_SchemaCachedModel):
     # A unique schema identifier for this data format.
-    jschema: str = Field(
-        "urn:sd:schema.workflow-simulator.request.1", alias="$schema")
+    jschema: str = Field(REQUEST_SCHEMA, alias="$schema")
     # Input values.
     mode: Optional[Literal["workflow", "chat", "warm"]] = Field(
         default=None,
@@ -47,9 +135,9 @@ class Request(BaseModel):
     )
     tick_interval_seconds: Optional[float] = Field(
         default=5.0,
-        description="Tick interval for timer_tick preset (seconds)"
+        description="Tick interval for timer_tick preset (seconds, min 0.01)"
     )
-    messages: Optional[list["ChatMessage"]] = Field(
+    messages: Optional[list[ChatMessage]] = Field(
         default=None,
         description="Conversation messages to send to the chat model",
     )
@@ -67,24 +155,22 @@ class Request(BaseModel):
     )
 
     # An example showing how to supply the input data.
-    model_config = ConfigDict(json_schema_extra={
-        "examples": [
-            {
-                "$schema": "urn:sd:schema.workflow-simulator.request.1",
-                "preset_name": "deep_research"
-            },
-            {
-                "$schema": "urn:sd:schema.workflow-simulator.request.1",
-                "mode": "warm"
-            },
-        ]
-    })
+    model_config = ConfigDict(json_schema_extra=_REQUEST_SCHEMA_EXTRA)
+
+    @cached_property
+    def is_chat(self) -> bool:
+        """Chat requested explicitly or implied by the chat $schema/messages."""
+        return (
+            self.mode == "chat"
+            or self.jschema == CHAT_REQUEST_SCHEMA
+            or bool(self.messages)
+        )
 
 
 # Specify result value(s).
-class Result(BaseModel):
+class Result(_SchemaCachedModel):
     # A unique schema identifier for this data format.
-    jschema: str = Field("urn:sd:schema.workflow-simulator.1", alias="$schema")
+    jschema: str = Field(RESULT_SCHEMA, alias="$schema")
     # Result values.
     message: str = Field(description="Success message on workflow completion")
     preset_name: Optional[str] = Field(
@@ -101,33 +187,12 @@ class Result(BaseModel):
         description="Total execution time in seconds")
 
     # An example showing what the result will look like.
-    model_config = ConfigDict(json_schema_extra={
-        "example": {
-            "$schema": "urn:sd:schema.workflow-simulator.1",
-            "message": "Workflow completed successfully",
-            "preset_name": "deep_research",
-            "phases_completed": 5,
-            "agents_executed": 12,
-            "total_events": 48,
-            "elapsed_seconds": 45.2
-        }
-    })
+    model_config = ConfigDict(
+        frozen=True, json_schema_extra=_RESULT_SCHEMA_EXTRA)
 
 
-class ChatMessage(BaseModel):
-    role: Literal["system", "user", "assistant"] = Field(
-        description="Role of this chat message"
-    )
-    content: str = Field(description="Text content of the message")
-
-
-Request.model_rebuild()
-
-
-class ChatRequest(BaseModel):
-    jschema: str = Field(
-        "urn:sd:schema.workflow-simulator.chat.request.1", alias="$schema"
-    )
+class ChatRequest(_SchemaCachedModel):
+    jschema: str = Field(CHAT_REQUEST_SCHEMA, alias="$schema")
     messages: list[ChatMessage] = Field(
         description="Conversation messages to send to the chat model"
     )
@@ -144,22 +209,11 @@ class ChatRequest(BaseModel):
         description="Optional upper bound for generated tokens",
     )
 
-    model_config = ConfigDict(json_schema_extra={
-        "example": {
-            "$schema": "urn:sd:schema.workflow-simulator.chat.request.1",
-            "model": "gpt-5-mini",
-            "messages": [
-                {"role": "system", "content": "You are concise and helpful."},
-                {"role": "user", "content": "Summarize the benefits of event streaming in one sentence."}
-            ]
-        }
-    })
-
-
-class ChatResult(BaseModel):
-    jschema: str = Field(
-        "urn:sd:schema.workflow-simulator.chat.result.1", alias="$schema"
-    )
+    model_config = ConfigDict(json_schema_extra=_CHAT_REQUEST_SCHEMA_EXTRA)
+
+
+class ChatResult(_SchemaCachedModel):
+    jschema: str = Field(CHAT_RESULT_SCHEMA, alias="$schema")
     message: str = Field(description="Success message on chat completion")
     model: str = Field(description="Model used for completion")
     response_text: str = Field(description="Final response text assembled from streamed chunks")
@@ -168,21 +222,54 @@ class ChatResult(BaseModel):
     total_events: int = Field(description="Total number of events emitted by this chat run")
     elapsed_seconds: float = Field(description="Total execution time in seconds")
 
-    model_config = ConfigDict(json_schema_extra={
-        "example": {
-            "$schema": "urn:sd:schema.workflow-simulator.chat.result.1",
-            "message": "Chat completed successfully",
-            "model": "gpt-5-mini",
-            "response_text": "Event streaming improves responsiveness by delivering partial output immediately.",
-            "chunks_emitted": 12,
-            "approx_tokens_emitted": 24,
-            "total_events": 31,
-            "elapsed_seconds": 2.41
-        }
-    })
+    model_config = ConfigDict(
+        frozen=True, json_schema_extra=_CHAT_RESULT_SCHEMA_EXTRA)
+
+
+def _dump_messages(messages: list[ChatMessage]) -> list[dict]:
+    """Plain role/content dicts for the chat simulator."""
+    return [{"role": m.role, "content": m.content} for m in messages]
+
+
+def _do_chat(req: Request | ChatRequest, jobCtxt: JobContext) -> dict:
+    """
+    Stream the requested chat completion and return the result fields shared
+    by ``Result`` and ``ChatResult``.
+    """
+    if not req.messages:
+        raise ValueError("messages must contain at least one chat message")
+
+    logger.info("Starting chat simulation with model: %s", req.model)
+    simulator = ChatSimulator(job_context=jobCtxt, logger=logger)
+    result = simulator.run_streaming_chat(
+        messages=_dump_messages(req.messages),
+        model=req.model or "gpt-5-mini",
+        temperature=req.temperature,
+        max_tokens=req.max_tokens,
+    )
+    logger.info(
+        "Chat completed: model=%s chunks=%s approx_tokens=%s total_events=%s elapsed=%.2fs",
+        result.model,
+        result.chunks_emitted,
+        result.approx_tokens_emitted,
+        result.total_events,
+        result.elapsed_seconds,
+    )
+    return {
+        "message": "Chat completed successfully",
+        "model": result.model,
+        "response_text": result.response_text,
+        "chunks_emitted": result.chunks_emitted,
+        "approx_tokens_emitted": result.approx_tokens_emitted,
+        "total_events": result.total_events,
+        "elapsed_seconds": round(result.elapsed_seconds, 2),
+    }
 
 
 # API Functionality.
+#
+# Results are assembled from values the service computed itself, so they are
+# built with ``model_construct`` rather than re-validated on every response.
 @ivcap_ai_tool("/", opts=ToolOptions(tags=["Workflow Simulator"]))
 def run_workflow_simulation(req: Request, jobCtxt: JobContext) -> Result:
     """
@@ -204,71 +291,57 @@ def run_workflow_simulation(req: Request, jobCtxt: JobContext) -> Result:
     - simple_pipeline: Basic 3-step sequential workflow for baseline testing
     - timer_tick: Simple timer that emits one event per tick interval
     """
-    # ------------------------------------------------------------------
-    # Warm mode – no-op to prime the service container
-    # ------------------------------------------------------------------
-    if req.mode == "warm":
-        t0 = time.monotonic()
-        logger.info("Warm-up request received; returning immediately")
-        with jobCtxt.report.step("warm:ready", message="Service is warm"):
-            pass
-        elapsed = time.monotonic() - t0
-        return Result(
-            message="Service warm-up complete",
-            total_events=1,
-            elapsed_seconds=round(elapsed, 4),
-        )
+    return _MODE_HANDLERS[_resolve_mode(req)](req, jobCtxt)
+
 
-    # ------------------------------------------------------------------
-    # Chat mode – explicit mode or auto-detected from schema / messages
-    # ------------------------------------------------------------------
-    is_chat_request = (
-        req.mode == "chat"
-        or req.jschema == "urn:sd:schema.workflow-simulator.chat.request.1"
-        or bool(req.messages)
+def _resolve_mode(req: Request) -> str:
+    """Pick the handler key; chat is also implied by its $schema or messages."""
+    if req.mode == "warm":
+        return "warm"
+    return "chat" if req.is_chat else "workflow"
+
+
+# ------------------------------------------------------------------
+# Warm mode – no-op to prime the service container
+# ------------------------------------------------------------------
+def _run_warm(req: Request, jobCtxt: JobContext) -> Result:
+    t0_ns = time.perf_counter_ns()
+    logger.info("Warm-up request received; returning immediately")
+    # Raw start/finish calls: the step() context manager would also set up
+    # an event scope (and tracing span) around an empty body.
+    report = jobCtxt.report
+    report.step_started("warm:ready", message="Service is warm")
+    report.step_finished("warm:ready")
+    # Open the LiteLLM proxy connection in the background so the first chat
+    # request after a warm-up does not pay for connection setup.
+    ChatSimulator.prewarm(logger)
+    elapsed_s = (time.perf_counter_ns() - t0_ns) / 1e9
+    return Result.model_construct(
+        message="Service warm-up complete",
+        total_events=1,
+        elapsed_seconds=round(elapsed_s, 4),
     )
 
-    if is_chat_request:
-        if not req.messages:
-            raise ValueError("messages must contain at least one chat message")
-
-        logger.info("Starting chat simulation with model: %s", req.model)
-        simulator = ChatSimulator(job_context=jobCtxt, logger=logger)
-        result = simulator.run_streaming_chat(
-            messages=[m.model_dump() for m in req.messages],
-            model=req.model or "gpt-5-mini",
-            temperature=req.temperature,
-            max_tokens=req.max_tokens,
-        )
-        logger.info(
-            "Chat completed: model=%s chunks=%s approx_tokens=%s total_events=%s elapsed=%.2fs",
-            result.model,
-            result.chunks_emitted,
-            result.approx_tokens_emitted,
-            result.total_events,
-            result.elapsed_seconds,
-        )
-        return Result(
-            jschema="urn:sd:schema.workflow-simulator.chat.result.1",
-            message="Chat completed successfully",
-            model=result.model,
-            response_text=result.response_text,
-            chunks_emitted=result.chunks_emitted,
-            approx_tokens_emitted=result.approx_tokens_emitted,
-            total_events=result.total_events,
-            elapsed_seconds=round(result.elapsed_seconds, 2),
-        )
 
-    # ------------------------------------------------------------------
-    # Workflow mode
-    # ------------------------------------------------------------------
+# ------------------------------------------------------------------
+# Chat mode – explicit mode or auto-detected from schema / messages
+# ------------------------------------------------------------------
+def _run_chat(req: Request, jobCtxt: JobContext) -> Result:
+    # Chat results from / keep Result's default $schema, as they always have.
+    return Result.model_construct(**_do_chat(req, jobCtxt))
+
+
+# ------------------------------------------------------------------
+# Workflow mode
+# ------------------------------------------------------------------
+def _run_workflow(req: Request, jobCtxt: JobContext) -> Result:
     if not req.preset_name:
         raise ValueError(
             "preset_name is required for workflow mode; for chat mode provide "
-            "$schema=urn:sd:schema.workflow-simulator.chat.request.1 and messages[]"
+            f"$schema={CHAT_REQUEST_SCHEMA} and messages[]"
         )
 
-    logger.info(f"Starting workflow simulation with preset: {req.preset_name}")
+    logger.info("Starting workflow simulation with preset: %s", req.preset_name)
 
     # Create simulator with the job context
     simulator = WorkflowSimulator(
@@ -278,33 +351,44 @@ def run_workflow_simulation(req: Request, jobCtxt: JobContext) -> Result:
 
     # Run the simulation
     if req.preset_name == "timer_tick":
-        if req.total_run_time_seconds <= 0 or req.tick_interval_seconds <= 0:
+        requested_seconds = req.total_run_time_seconds
+        if min(requested_seconds, req.tick_interval_seconds) <= 0:
             raise ValueError(
                 "total_run_time_seconds and tick_interval_seconds must be > 0"
             )
-        total_run_time_seconds = req.total_run_time_seconds
-        if total_run_time_seconds > WorkflowSimulator.MAX_TIMER_SECONDS:
+        total_run_time_seconds = min(
+            requested_seconds, WorkflowSimulator.MAX_TIMER_SECONDS)
+        if total_run_time_seconds != requested_seconds:
             logger.warning(
                 "total_run_time_seconds=%s exceeds max of %ss; capping to max",
-                total_run_time_seconds,
+                requested_seconds,
                 WorkflowSimulator.MAX_TIMER_SECONDS,
             )
-            total_run_time_seconds = WorkflowSimulator.MAX_TIMER_SECONDS
+        tick_interval_seconds = max(
+            req.tick_interval_seconds, WorkflowSimulator.MIN_TICK_INTERVAL_SECONDS)
+        if tick_interval_seconds != req.tick_interval_seconds:
+            logger.warning(
+                "tick_interval_seconds=%s is below min of %ss; raising to min",
+                req.tick_interval_seconds,
+                WorkflowSimulator.MIN_TICK_INTERVAL_SECONDS,
+            )
 
         result = simulator.run_timer_tick(
             total_run_time_seconds=total_run_time_seconds,
-            tick_interval_seconds=req.tick_interval_seconds,
+            tick_interval_seconds=tick_interval_seconds,
         )
     else:
         result = simulator.run(req.preset_name)
 
     logger.info(
-        f"Workflow completed: {result.phases_completed} phases, "
-        f"{result.agents_executed} agents, {result.total_events} events, "
-        f"{result.elapsed_seconds:.1f}s"
+        "Workflow completed: %s phases, %s agents, %s events, %.1fs",
+        result.phases_completed,
+        result.agents_executed,
+        result.total_events,
+        result.elapsed_seconds,
     )
 
-    return Result(
+    return Result.model_construct(
         message="Workflow completed successfully",
         preset_name=result.preset_name,
         phases_completed=result.phases_completed,
@@ -314,6 +398,13 @@ def run_workflow_simulation(req: Request, jobCtxt: JobContext) -> Result:
     )
 
 
+_MODE_HANDLERS = {
+    "warm": _run_warm,
+    "chat": _run_chat,
+    "workflow": _run_workflow,
+}
+
+
 @ivcap_ai_tool("/chat", opts=ToolOptions(tags=["Workflow Simulator", "Chatbot"]))
 def run_chat_simulation(req: ChatRequest, jobCtxt: JobContext) -> ChatResult:
     """
@@ -323,36 +414,21 @@ def run_chat_simulation(req: ChatRequest, jobCtxt: JobContext) -> ChatResult:
     - LITELLM_PROXY: LiteLLM proxy base URL
     - IVCAP_JWT: bearer token used for proxy authentication
     """
-    if not req.messages:
-        raise ValueError("messages must contain at least one chat message")
+    return ChatResult.model_construct(**_do_chat(req, jobCtxt))
 
-    logger.info("Starting chat simulation with model: %s", req.model)
-    simulator = ChatSimulator(job_context=jobCtxt, logger=logger)
-    result = simulator.run_streaming_chat(
-        messages=[m.model_dump() for m in req.messages],
-        model=req.model,
-        temperature=req.temperature,
-        max_tokens=req.max_tokens,
-    )
 
-    logger.info(
-        "Chat completed: model=%s chunks=%s approx_tokens=%s total_events=%s elapsed=%.2fs",
-        result.model,
-        result.chunks_emitted,
-        result.approx_tokens_emitted,
-        result.total_events,
-        result.elapsed_seconds,
-    )
-    return ChatResult(
-        message="Chat completed successfully",
-        model=result.model,
-        response_text=result.response_text,
-        chunks_emitted=result.chunks_emitted,
-        approx_tokens_emitted=result.approx_tokens_emitted,
-        total_events=result.total_events,
-        elapsed_seconds=round(result.elapsed_seconds, 2),
-    )
+def _warm_caches() -> None:
+    """Build model schemas and parse bundled presets before serving traffic."""
+    for model in (Request, Result, ChatRequest, ChatResult):
+        model.model_json_schema()
+    simulator = WorkflowSimulator(job_context=None, logger=logger)
+    for preset_name in simulator.list_presets():
+        try:
+            simulator.load_preset(preset_name)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning("Failed to preload preset %s: %s", preset_name, exc)
 
 
 if __name__ == "__main__":
+    _warm_caches()
     start_tool_server(service)